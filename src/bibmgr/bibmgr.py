@@ -3,22 +3,113 @@
 # TODO Add command to look up existing key
 # TODO Print filename in ``add``
 
+import concurrent.futures
 import configparser
+import dataclasses
+import functools
+import itertools
 import logging
 import os
 import pathlib
+import pickle
+import re
+import shelve
 import subprocess
-from typing import Optional, Sequence
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, List, Optional, Sequence, Tuple
 
-import bibtexparser
 import click
-from pdflu import parse, search
 
 from . import library_model, utilities
 
+# ``bibtexparser`` and the ``pdflu`` parsing/search machinery are imported
+# lazily inside the commands that need them to keep CLI startup fast.
+if TYPE_CHECKING:
+    from pdflu import parse, search
+
 log = logging.getLogger(__name__)
 log.addHandler(logging.NullHandler())
 
+# How long cached identifier query results stay valid (30 days)
+_QUERY_CACHE_TTL = 30 * 24 * 60 * 60
+
+# Serializes access to the query cache shelf; concurrent opens fail with
+# locking dbm backends and can corrupt the shelf with non-locking ones
+_QUERY_CACHE_LOCK = threading.Lock()
+
+# Separator between field names in config values, tolerant of whitespace
+_FIELD_SPLIT_RE = re.compile(r'[,\s]+')
+
+# Default configuration values, shared by every invocation
+_DEFAULT_CONFIG = {
+    'default_library':
+    '',
+    'filename_words':
+    4,
+    'filename_length':
+    100,
+    'key_length':
+    40,
+    'editor':
+    '',
+    'field_order': ('title, author, month, year, booktitle, journaltitle, '
+                    'eventtitle, journal, publisher, location, series, '
+                    'volume, number, pages, numpages, issn, doi, url, '
+                    'groups, keywords, comment, file'),
+    'mandatory_fields': ('title, author, year, groups, keywords, comment, '
+                         'file'),
+    'max_query_results':
+    10,
+    'query_confidence_threshold':
+    0.9,
+    'polite_pool_email':
+    '',
+    'max_pages':
+    2,
+    'max_lines':
+    4,
+    'min_words':
+    2,
+    'max_words':
+    30,
+    'max_chars':
+    200,
+    'bibtex_file':
+    '',
+    'storage_path':
+    '',
+    'default_group':
+    'unfiled',
+}
+
+# Parameter type for options and arguments that take an existing file
+_PATH_FILE = click.Path(exists=True, dir_okay=False, path_type=pathlib.Path)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class BibmgrSettings:
+    """Settings extracted from the configuration file.
+
+    Attribute access on this dataclass is much cheaper than the repeated
+    ``ConfigParser`` lookups it replaces in the commands.
+    """
+
+    editor: str
+    filename_words: int
+    filename_length: int
+    key_length: int
+    field_order: Tuple[str, ...]
+    mandatory_fields: Tuple[str, ...]
+    max_query_results: int
+    query_confidence_threshold: float
+    polite_pool_email: str
+    max_pages: int
+    max_lines: int
+    min_words: int
+    max_words: int
+    max_chars: int
+
 
 @click.group()
 @click.option('--verbose', is_flag=True, help='Print detailed output.')
@@ -31,7 +122,7 @@ log.addHandler(logging.NullHandler())
 @click.option(
     '-c',
     '--config',
-    type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+    type=_PATH_FILE,
     help='Specify configuration file.',
 )
 @click.option(
@@ -55,50 +146,33 @@ def cli(ctx, verbose, debug, dry_run, config, library):
         formatter = '%(levelname)s: %(message)s'
     logging.basicConfig(format=formatter, level=logging_level)
     # Parse config
-    conf = configparser.ConfigParser()
-    conf['DEFAULT'] = {
-        'default_library':
-        '',
-        'filename_words':
-        4,
-        'filename_length':
-        100,
-        'key_length':
-        40,
-        'editor':
-        '',
-        'field_order': ('title, author, month, year, booktitle, journaltitle, '
-                        'eventtitle, journal, publisher, location, series, '
-                        'volume, number, pages, numpages, issn, doi, url, '
-                        'groups, keywords, comment, file'),
-        'mandatory_fields': ('title, author, year, groups, keywords, comment, '
-                             'file'),
-        'max_query_results':
-        10,
-        'polite_pool_email':
-        '',
-        'max_pages':
-        2,
-        'max_lines':
-        4,
-        'min_words':
-        2,
-        'max_words':
-        30,
-        'max_chars':
-        200,
-        'bibtex_file':
-        '',
-        'storage_path':
-        '',
-        'default_group':
-        'unfiled',
-    }
-    conf.read(_get_default_config_path() if config is None else config)
+    conf = _load_config(_get_default_config_path() if config is None else
+                        config)
     if library is None:
         selected_lib = conf.get('bibmgr', 'default_library')
     else:
         selected_lib = library
+    # Extract settings once
+    parsing = conf['parsing'] if conf.has_section('parsing') else (
+        conf['DEFAULT'])
+    settings = BibmgrSettings(
+        editor=conf.get('bibmgr', 'editor'),
+        filename_words=conf.getint('bibmgr', 'filename_words'),
+        filename_length=conf.getint('bibmgr', 'filename_length'),
+        key_length=conf.getint('bibmgr', 'key_length'),
+        field_order=_split_fields(conf.get('bibmgr', 'field_order')),
+        mandatory_fields=_split_fields(
+            conf.get('bibmgr', 'mandatory_fields')),
+        max_query_results=conf.getint('bibmgr', 'max_query_results'),
+        query_confidence_threshold=conf.getfloat(
+            'bibmgr', 'query_confidence_threshold'),
+        polite_pool_email=conf.get('bibmgr', 'polite_pool_email'),
+        max_pages=parsing.getint('max_pages'),
+        max_lines=parsing.getint('max_lines'),
+        min_words=parsing.getint('min_words'),
+        max_words=parsing.getint('max_words'),
+        max_chars=parsing.getint('max_chars'),
+    )
     # Create library
     ctx.obj = {
         'library':
@@ -106,15 +180,15 @@ def cli(ctx, verbose, debug, dry_run, config, library):
             conf.get(selected_lib, 'bibtex_file'),
             conf.get(selected_lib, 'storage_path'),
             conf.get(selected_lib, 'default_group'),
-            conf.getint('bibmgr', 'filename_words'),
-            conf.getint('bibmgr', 'filename_length'),
-            conf.getint('bibmgr', 'key_length'),
-            conf.get('bibmgr', 'field_order').split(', '),
-            conf.get('bibmgr', 'mandatory_fields').split(', '),
+            settings.filename_words,
+            settings.filename_length,
+            settings.key_length,
+            settings.field_order,
+            settings.mandatory_fields,
             dry_run,
         ),
-        'config':
-        conf,
+        'settings':
+        settings,
     }
 
 
@@ -142,7 +216,7 @@ def org(obj):
 def edit(obj):
     """Open BibTeX library in text editor."""
     library = obj['library']
-    conf_editor = obj['config'].get('bibmgr', 'editor')
+    conf_editor = obj['settings'].editor
     env_editor = os.environ.get('EDITOR')
     editor = env_editor if conf_editor is None else conf_editor
     subprocess.call([editor, library.bibtex_file])
@@ -151,7 +225,7 @@ def edit(obj):
 @cli.command()
 @click.argument(
     'files',
-    type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+    type=_PATH_FILE,
     nargs=-1,
 )
 @click.option(
@@ -190,6 +264,8 @@ def edit(obj):
 @click.pass_obj
 def add(obj, files, key, query, keywords, skip_query, interactive):
     """Add linked files to BibTeX library."""
+    import bibtexparser
+
     if len(files) > 1:
         if query:
             log.info('Query unsupported when adding multiple files.')
@@ -198,142 +274,373 @@ def add(obj, files, key, query, keywords, skip_query, interactive):
             log.info('Key unsupported when adding multiple files.')
             return
     library = obj['library']
-    config = obj['config']
+    settings = obj['settings']
     library.open()
-    for file in files:
-        new_key = library.add_file(file, key)
-        if skip_query:
-            continue
-        if query:
-            entries = _query_string(
-                query,
-                limit=config.getint('bibmgr', 'max_query_results'),
-                mailto=config.get('bibmgr', 'polite_pool_email'),
-            )
-        else:
-            # Get metadata
-            metadata = parse.parse_pdf(
-                file,
-                max_pages=config.getint('parsing', 'max_pages'),
-                max_lines=config.getint('parsing', 'max_lines'),
-                min_words=config.getint('parsing', 'min_words'),
-                max_words=config.getint('parsing', 'max_words'),
-                max_chars=config.getint('parsing', 'max_chars'),
-            )
-            if interactive:
-                print('Metadata')
-                print('--------')
-                print(metadata)
-                print()
-            # Query online based on metadata
-            entries = _query_file(
-                metadata,
-                limit=config.getint('bibmgr', 'max_query_results'),
-                mailto=config.get('bibmgr', 'polite_pool_email'),
-            )
+    # Link the files into the library first. This mutates library state, so
+    # it stays serial.
+    new_keys = [library.add_file(file, key) for file in files]
+    if skip_query:
+        library.write_bib_file()
+        return
+    if interactive or query or (len(files) <= 1):
+        # Process files one at a time so interactive prompts stay in order
+        for (file, new_key) in zip(files, new_keys):
             sel = 0
-            if interactive:
-                print('Results')
-                print('-------')
-                for (k, result) in enumerate(entries):
-                    result_str = str(result).replace('\n', '\n    ')
-                    print(f'[{k}] {result_str}')
-                print('[s] skip')
-                print('[q] quit')
-                sel_str = click.prompt('Selection', default='0')
-                print()
-                if sel_str == 's':
-                    continue
-                elif sel_str == 'q':
-                    return
-                else:
-                    sel = int(sel_str)
-        if entries:
-            if (len(entries) > 1) and (sel < len(entries)) and interactive:
-                selected_entry = entries[sel].get_entry()
+            if query:
+                entries = _query_string(
+                    query,
+                    limit=settings.max_query_results,
+                    mailto=settings.polite_pool_email,
+                    confidence_threshold=(
+                        settings.query_confidence_threshold),
+                )
             else:
+                # Get metadata
+                metadata = _parse_pdf(file, settings)
+                if interactive:
+                    print('Metadata')
+                    print('--------')
+                    print(metadata)
+                    print()
+                # Query online based on metadata
+                entries = _query_file(
+                    metadata,
+                    limit=settings.max_query_results,
+                    mailto=settings.polite_pool_email,
+                    confidence_threshold=(
+                        settings.query_confidence_threshold),
+                )
+                if interactive:
+                    print('Results')
+                    print('-------')
+                    for (k, result) in enumerate(entries):
+                        result_str = str(result).replace('\n', '\n    ')
+                        print(f'[{k}] {result_str}')
+                    print('[s] skip')
+                    print('[q] quit')
+                    sel_str = click.prompt('Selection', default='0')
+                    print()
+                    if sel_str == 's':
+                        continue
+                    elif sel_str == 'q':
+                        return
+                    else:
+                        sel = int(sel_str)
+            if entries:
+                if (len(entries) > 1) and (sel < len(entries)) and interactive:
+                    selected_entry = entries[sel].get_entry()
+                else:
+                    selected_entry = entries[0].get_entry()
+                if keywords:
+                    selected_entry.set_field(
+                        bibtexparser.model.Field(
+                            key='keywords',
+                            value=keywords,
+                        ))
+                library.update_entry(new_key, selected_entry)
+    else:
+        # Parse and query the files concurrently. Each file's PDF parse and
+        # online queries are independent, so pipeline them across a thread
+        # pool and apply the results to the library serially afterwards.
+        max_workers = min(len(files), 8)
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers) as executor:
+            metadatas = list(
+                executor.map(
+                    lambda file: _parse_pdf(file, settings),
+                    files,
+                ))
+            entries_per_file = list(
+                executor.map(
+                    lambda metadata: _query_file(
+                        metadata,
+                        limit=settings.max_query_results,
+                        mailto=settings.polite_pool_email,
+                        confidence_threshold=(
+                            settings.query_confidence_threshold),
+                    ),
+                    metadatas,
+                ))
+        for (new_key, entries) in zip(new_keys, entries_per_file):
+            if entries:
                 selected_entry = entries[0].get_entry()
-            if keywords:
-                selected_entry.set_field(
-                    bibtexparser.model.Field(
-                        key='keywords',
-                        value=keywords,
-                    ))
-            library.update_entry(new_key, selected_entry)
-    if not skip_query:
-        library.organize()
+                if keywords:
+                    selected_entry.set_field(
+                        bibtexparser.model.Field(
+                            key='keywords',
+                            value=keywords,
+                        ))
+                library.update_entry(new_key, selected_entry)
+    library.organize()
     library.write_bib_file()
 
 
 def _query_file(
-    metadata: parse.Metadata,
+    metadata: 'parse.Metadata',
     limit: int = 10,
     mailto: Optional[str] = None,
-) -> Sequence[search.SearchResult]:
+    confidence_threshold: float = 0.9,
+) -> Sequence['search.SearchResult']:
     """Query by file metadata."""
+    from pdflu import search
+
     if not mailto:
         log.warn('`mailto` not specified, not in Crossref polite pool.')
     # Check metadata
     if not metadata:
         return []
     # Search by DOI first
-    entries: Sequence[search.SearchResult]
+    entries: Sequence['search.SearchResult']
     if metadata.doi:
-        entries = search.query_crossref_doi(metadata.doi, mailto=mailto)
+        entries = _cached_query(
+            f'xref:{metadata.doi}',
+            lambda: search.query_crossref_doi(metadata.doi, mailto=mailto),
+        )
         if entries:
             return entries
     # Search by arXiv ID if no DOI
     if metadata.arxiv_id:
-        entries = search.query_arxiv_id(metadata.arxiv_id)
+        entries = _cached_query(
+            f'arxiv:{metadata.arxiv_id}',
+            lambda: search.query_arxiv_id(metadata.arxiv_id),
+        )
         if entries:
             return entries
     # Fall back on text query
     query_title = utilities.clean_string_for_query(metadata.title)
     query_author = utilities.clean_string_for_query(metadata.author)
     query = query_title + query_author
-    ranked_entries = _query_string(query, limit=limit, mailto=mailto)
+    ranked_entries = _query_string(
+        query,
+        limit=limit,
+        mailto=mailto,
+        confidence_threshold=confidence_threshold,
+    )
     return ranked_entries
 
 
+def _split_fields(field_str: str) -> Tuple[str, ...]:
+    """Split a comma-separated field list from the config.
+
+    Tolerates any spacing around the commas, including newlines in
+    multi-line config values.
+    """
+    return tuple(
+        field for field in _FIELD_SPLIT_RE.split(field_str.strip()) if field)
+
+
+def _parse_pdf(
+    file: pathlib.Path,
+    settings: BibmgrSettings,
+) -> 'parse.Metadata':
+    """Parse a PDF, checking the first page for identifiers first.
+
+    A one-page parse is usually enough to find a DOI or arXiv ID, and when
+    one is present ``_query_file`` never looks at the remaining metadata.
+    Only files without identifiers on the first page pay for the full
+    ``max_pages`` parse.
+    """
+    from pdflu import parse
+
+    metadata = parse.parse_pdf(
+        file,
+        max_pages=1,
+        max_lines=settings.max_lines,
+        min_words=settings.min_words,
+        max_words=settings.max_words,
+        max_chars=settings.max_chars,
+    )
+    if metadata and (metadata.doi or metadata.arxiv_id):
+        return metadata
+    if settings.max_pages <= 1:
+        return metadata
+    return parse.parse_pdf(
+        file,
+        max_pages=settings.max_pages,
+        max_lines=settings.max_lines,
+        min_words=settings.min_words,
+        max_words=settings.max_words,
+        max_chars=settings.max_chars,
+    )
+
+
+def _cached_query(
+    cache_key: str,
+    query_func: Callable[[], Sequence['search.SearchResult']],
+) -> List['search.SearchResult']:
+    """Run a metadata query, memoizing the result on disk.
+
+    DOI, arXiv ID, and text-based lookups are pure functions of their
+    arguments, so their results are stored in a shelf in the cache directory
+    and reused for ``_QUERY_CACHE_TTL`` seconds. Re-adding or retrying the
+    same file therefore skips the network round-trip entirely.
+    """
+    cache_dir = _get_default_cache_path()
+    if cache_dir is None:
+        return list(query_func())
+    shelf_path = str(cache_dir.joinpath('queries'))
+    # Hold the lock only around shelf access, not the network query, so
+    # concurrent lookups in the batch ``add`` path still overlap.
+    with _QUERY_CACHE_LOCK:
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            with shelve.open(shelf_path) as shelf:
+                try:
+                    timestamp, entries = shelf[cache_key]
+                    if time.time() - timestamp < _QUERY_CACHE_TTL:
+                        log.debug('Using cached result for `%s`.', cache_key)
+                        return entries
+                except KeyError:
+                    pass
+                except (pickle.PickleError, EOFError, ValueError,
+                        AttributeError):
+                    log.debug(
+                        'Could not read cached result for `%s`.', cache_key)
+        except OSError:
+            log.debug('Could not open query cache `%s`.', shelf_path)
+    entries = list(query_func())
+    with _QUERY_CACHE_LOCK:
+        try:
+            with shelve.open(shelf_path) as shelf:
+                shelf[cache_key] = (time.time(), entries)
+        except (OSError, pickle.PickleError, TypeError, AttributeError):
+            log.debug('Could not cache result for `%s`.', cache_key)
+    return entries
+
+
 def _query_string(
     query: str,
     limit: int = 10,
     mailto: Optional[str] = None,
-) -> Sequence[search.SearchResult]:
-    """Query by file."""
+    confidence_threshold: float = 0.9,
+) -> Sequence['search.SearchResult']:
+    """Query by file.
+
+    Queries Crossref first and returns right away when the top-ranked
+    result scores at or above ``confidence_threshold``. Only low-confidence
+    queries pay for the additional arXiv round-trip.
+    """
+    from pdflu import search
+
     if not mailto:
         log.warn('`mailto` not specified, not in Crossref polite pool.')
-    entries_crossref = search.query_crossref(query, limit=limit, mailto=mailto)
-    entries_arxiv = search.query_arxiv(query, limit=limit)
-    entries = list(entries_crossref) + list(entries_arxiv)
+    entries_crossref = _cached_query(
+        f'xref-q:{limit}:{query}',
+        lambda: search.query_crossref(query, limit=limit, mailto=mailto))
+    if entries_crossref:
+        ranked_crossref = search.rank_results(entries_crossref, query)
+        if ranked_crossref[0].score >= confidence_threshold:
+            return ranked_crossref
+    entries_arxiv = _cached_query(
+        f'arxiv-q:{limit}:{query}',
+        lambda: search.query_arxiv(query, limit=limit))
+    if entries_crossref and not entries_arxiv:
+        # Nothing new to rank; the Crossref-only ranking stands
+        return ranked_crossref
+    entries = list(itertools.chain(entries_crossref, entries_arxiv))
+    # Nothing to rank with zero or one result
+    if len(entries) <= 1:
+        return entries
     ranked_entries = search.rank_results(entries, query)
     return ranked_entries
 
 
+def _load_config(
+        config_path: Optional[pathlib.Path]) -> configparser.RawConfigParser:
+    """Load the configuration file, reusing a cached parse when possible.
+
+    The parsed ``ConfigParser`` is pickled to the cache directory along with
+    the configuration file's path, its modification time, and the defaults it
+    was built with. As long as the file has not changed and the built-in
+    defaults still match, subsequent invocations load the pickle instead of
+    re-parsing the file.
+    """
+    try:
+        mtime_ns = os.stat(config_path).st_mtime_ns
+    except (OSError, TypeError):
+        mtime_ns = None
+    # Check for an up-to-date cached parse
+    cache_dir = _get_default_cache_path()
+    cache_file = None
+    if (cache_dir is not None) and (mtime_ns is not None):
+        cache_file = cache_dir.joinpath('conf.pkl')
+        try:
+            with open(cache_file, 'rb') as f:
+                cached_path, cached_mtime_ns, cached_defaults, conf = (
+                    pickle.load(f))
+            # The pickled parser bakes in the defaults from cache-write
+            # time, so a cache written by an older version must be
+            # discarded when ``_DEFAULT_CONFIG`` gains or changes options.
+            if ((cached_path == str(config_path))
+                    and (cached_mtime_ns == mtime_ns)
+                    and (cached_defaults == _DEFAULT_CONFIG)):
+                return conf
+        except (OSError, pickle.PickleError, EOFError, ValueError):
+            pass
+    # Parse config. None of the settings use interpolation, so skip the
+    # `%(...)s` scan that `ConfigParser` runs on every value access.
+    conf = configparser.RawConfigParser()
+    conf['DEFAULT'] = _DEFAULT_CONFIG
+    if config_path is not None:
+        conf.read(config_path)
+    # Cache the parsed config for the next invocation
+    if cache_file is not None:
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_file, 'wb') as f:
+                pickle.dump(
+                    (str(config_path), mtime_ns, _DEFAULT_CONFIG, conf), f)
+        except (OSError, pickle.PickleError):
+            log.debug('Could not write config cache `%s`.', cache_file)
+    return conf
+
+
+@functools.lru_cache(maxsize=1)
+def _get_default_cache_path() -> Optional[pathlib.Path]:
+    """Get default cache directory.
+
+    The result only depends on the environment, so it is computed once and
+    cached.
+    """
+    cache_dir = 'bibmgr'
+    if os.name == 'posix':
+        # Use XDG default if specified, or ``~/.cache`` if not
+        xdg_cache_home = os.environ.get('XDG_CACHE_HOME')
+        if not xdg_cache_home:
+            home = os.environ.get('HOME')
+            if home is None:
+                return None
+            xdg_cache_home = os.path.join(home, '.cache')
+        return pathlib.Path(os.path.join(xdg_cache_home, cache_dir))
+    # Use ``%LOCALAPPDATA%`` if specified
+    localappdata = os.environ.get('LOCALAPPDATA')
+    if localappdata is not None:
+        return pathlib.Path(os.path.join(localappdata, cache_dir, 'cache'))
+    return None
+
+
+@functools.lru_cache(maxsize=1)
 def _get_default_config_path() -> Optional[pathlib.Path]:
-    """Get default config path."""
-    config_file = 'bibmgr/bibmgr.conf'
+    """Get default config path.
+
+    The result only depends on the environment, so it is computed once and
+    cached.
+    """
+    config_file = os.path.join('bibmgr', 'bibmgr.conf')
     if os.name == 'posix':
-        # Use XDG default if specified
-        xdg_config_home_raw = os.environ.get('XDG_CONFIG_HOME')
-        if xdg_config_home_raw is None:
-            # Use ``~/.config`` if not specified
+        # Use XDG default if specified, or ``~/.config`` if not
+        xdg_config_home = os.environ.get('XDG_CONFIG_HOME')
+        if not xdg_config_home:
             home = os.environ.get('HOME')
-            if home is not None:
-                xdg_config_home = pathlib.Path(home, '.config')
-            else:
+            if home is None:
                 return None
-        else:
-            xdg_config_home = pathlib.Path(xdg_config_home_raw)
-        default_conf_path = xdg_config_home.joinpath(config_file)
-    else:
-        # Use ``%LOCALAPPDATA%`` if specified
-        localappdata = os.environ.get('LOCALAPPDATA')
-        if localappdata is not None:
-            default_conf_path = pathlib.Path(localappdata, config_file)
-        else:
-            return None
-    return default_conf_path
+            xdg_config_home = os.path.join(home, '.config')
+        return pathlib.Path(os.path.join(xdg_config_home, config_file))
+    # Use ``%LOCALAPPDATA%`` if specified
+    localappdata = os.environ.get('LOCALAPPDATA')
+    if localappdata is not None:
+        return pathlib.Path(os.path.join(localappdata, config_file))
+    return None
 
 
 if __name__ == '__main__':
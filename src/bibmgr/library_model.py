@@ -2,9 +2,12 @@
 
 import copy
 import logging
+import os
 import pathlib
+import pickle
 import shutil
-from typing import Dict, List, Optional
+import stat
+from typing import Dict, Optional, Sequence, Tuple
 
 import bibtexparser
 
@@ -14,6 +17,32 @@ log = logging.getLogger(__name__)
 log.addHandler(logging.NullHandler())
 
 
+class _SortFieldsMiddleware(
+        bibtexparser.middlewares.SortFieldsCustomMiddleware):
+    """Field-order sort with a precomputed rank lookup.
+
+    The stock middleware ranks each field with ``list.index``, which is
+    quadratic in the number of fields per entry; a dict lookup built once
+    at construction makes the sort linear.
+    """
+
+    def __init__(self, order: Sequence[str]) -> None:
+        """Instantiate ``_SortFieldsMiddleware``."""
+        super().__init__(order=tuple(order))
+        self._order_index = {key: i for i, key in enumerate(self._order)}
+
+    # docstr-coverage: inherited
+    def transform_entry(self, entry, library):
+        unknown = len(self._order_index)
+        entry.fields = sorted(
+            entry.fields,
+            key=lambda field: self._order_index.get(field.key.lower(),
+                                                    unknown),
+        )
+        entry.parser_metadata[self.metadata_key()] = self._order
+        return entry
+
+
 class Library:
     """BibTeX library."""
 
@@ -25,23 +54,42 @@ class Library:
         filename_words: int,
         filename_length: int,
         key_length: int,
-        field_order: List[str],
-        mandatory_fields: List[str],
+        field_order: Sequence[str],
+        mandatory_fields: Sequence[str],
         dry_run: bool,
     ) -> None:
         """Instantiate ``Library``."""
         # Paths and settings
         self.bibtex_file = pathlib.Path(bibtex_file)
         self.storage_path = pathlib.Path(storage_path)
+        # Resolve the storage path once; hot loops join group and file names
+        # onto the plain string instead of building intermediate path objects.
+        self._storage_str = str(self.storage_path.resolve())
         self.default_group = default_group
         self.filename_words = filename_words
         self.filename_length = filename_length
         self.key_length = key_length
-        self.field_order = field_order
-        self.mandatory_fields = mandatory_fields
+        # Freeze the field collections once; the write middlewares take
+        # the order as a tuple.
+        self.field_order = tuple(field_order)
+        self.mandatory_fields = tuple(mandatory_fields)
         self.dry_run = dry_run
+        # Cache the device of the storage path so moves within the same
+        # filesystem can use a plain rename instead of ``shutil.move``.
+        try:
+            self._storage_dev: Optional[int] = os.stat(
+                self.storage_path).st_dev
+        except OSError:
+            self._storage_dev = None
         # Set up database
         self._db: Optional[bibtexparser.Library] = None
+        # Build the write middlewares once; they are stateless between
+        # transforms, and the sort middleware precomputes its rank lookup.
+        self._write_middleware = [
+            bibtexparser.middlewares.MergeNameParts(),
+            bibtexparser.middlewares.MergeCoAuthors(),
+            _SortFieldsMiddleware(self.field_order),
+        ]
         # Set up BibTeX format
         self._bibtex_format = bibtexparser.BibtexFormat()
         self._bibtex_format.indent = '    '
@@ -53,37 +101,45 @@ class Library:
         """Backup file for BibTeX library."""
         return pathlib.Path(str(self.bibtex_file) + '.bak')
 
+    @property
+    def bibtex_cache_file(self) -> pathlib.Path:
+        """Cache file holding the parsed BibTeX library."""
+        return pathlib.Path(str(self.bibtex_file) + '.pkl')
+
     def open(self) -> None:
-        """Open BibTeX file."""
+        """Open BibTeX file.
+
+        Loads the parsed library from the cache file if the BibTeX file has
+        not changed since the cache was written. Otherwise, parses the BibTeX
+        file and refreshes the cache.
+        """
         if self._db is None:
-            log.info(f'Opening `{self.bibtex_file}`.')
-            self._db = bibtexparser.parse_file(
-                str(self.bibtex_file.resolve()),
-                append_middleware=[
-                    bibtexparser.middlewares.SeparateCoAuthors(),
-                    bibtexparser.middlewares.SplitNameParts(),
-                ],
-            )
-            if len(self._db.failed_blocks) > 0:
-                failed_blocks = [
-                    block.start_line for block in self._db.failed_blocks
-                ]
-                log.warning(
-                    f'Failed to parse blocks on lines: {failed_blocks}')
+            log.info('Opening `%s`.', self.bibtex_file)
+            self._db = self._read_db_cache()
+            if self._db is None:
+                self._db = bibtexparser.parse_file(
+                    str(self.bibtex_file),
+                    append_middleware=[
+                        bibtexparser.middlewares.SeparateCoAuthors(),
+                        bibtexparser.middlewares.SplitNameParts(),
+                    ],
+                )
+                if len(self._db.failed_blocks) > 0:
+                    failed_blocks = [
+                        block.start_line for block in self._db.failed_blocks
+                    ]
+                    log.warning('Failed to parse blocks on lines: %s',
+                                failed_blocks)
+                self._write_db_cache()
         else:
-            log.info(f'File `{self.bibtex_file}` already open.')
+            log.info('File `%s` already open.', self.bibtex_file)
 
     def print(self) -> None:
         """Print BibTeX file."""
         db = self._get_db()
         bib_str = bibtexparser.write_string(
             db,
-            prepend_middleware=[
-                bibtexparser.middlewares.MergeNameParts(),
-                bibtexparser.middlewares.MergeCoAuthors(),
-                bibtexparser.middlewares.SortFieldsCustomMiddleware(
-                    order=tuple(self.field_order)),
-            ],
+            prepend_middleware=self._write_middleware,
             bibtex_format=self._bibtex_format,
         )
         print(bib_str)
@@ -95,22 +151,32 @@ class Library:
         and they are moved there.
         """
         db = self._get_db()
+        # Enumerate existing group directories once instead of checking
+        # ``exists()`` for every entry.
+        try:
+            existing = {
+                dir_entry.name
+                for dir_entry in os.scandir(self.storage_path)
+                if dir_entry.is_dir()
+            }
+        except OSError:
+            existing = set()
+        # Collect the groups required by the entries
+        needed = set()
         for entry in db.entries:
-            # If group doesn't exist, set it to the default
+            # If group doesn't exist, use the default
             if ('groups' in entry) and (entry['groups'] != ''):
-                group_path = self.storage_path.joinpath(entry['groups'])
+                needed.add(entry['groups'])
             else:
-                group_path = self.storage_path.joinpath(self.default_group)
-            # If folder does not already exist, create it.
-            if not group_path.exists():
-                if self.dry_run:
-                    self._dry_run_msg(f'Creating `{group_path}`.')
-                else:
-                    log.info(f'Creating `{group_path}`.')
-                    group_path.mkdir(parents=True, exist_ok=True)
+                needed.add(self.default_group)
+        # Create only the missing directories
+        for group in sorted(needed - existing):
+            group_path = self.storage_path.joinpath(group)
+            if self.dry_run:
+                self._dry_run_msg(f'Creating `{group_path}`.')
             else:
-                log.debug(
-                    f'Directory `{group_path}` already exists. Skipping.')
+                log.info('Creating `%s`.', group_path)
+                group_path.mkdir(parents=True, exist_ok=True)
 
     def create_missing_fields(self) -> None:
         """Create missing fields."""
@@ -140,10 +206,13 @@ class Library:
         generated is empty, it is skipped.
         """
         db = self._get_db()
+        # One scandir pass per group replaces a stat syscall per entry.
+        file_index = self._build_file_index()
         for entry in db.entries:
             # Skip entries with invalid files.
             # Logging takes place inside helper function!
-            if not self._entry_file_is_valid(entry):
+            old_path = self._entry_file_path(entry, file_index)
+            if old_path is None:
                 continue
             # Generate the new filename using a helper function.
             filename = self._entry_string(
@@ -153,57 +222,60 @@ class Library:
             )
             # If the new filename is empty skip.
             if (filename is None) or (filename == ''):
-                log.warn('Cannot generate new file name for entry with '
-                         f'key `{entry.key}`. Skipping.')
+                log.warn(
+                    'Cannot generate new file name for entry with '
+                    'key `%s`. Skipping.', entry.key)
                 continue
-            # Get old path from entry and extract extension.
-            old_path = pathlib.Path(entry['file'])
+            # Extract extension from the validated path
             ext = utilities.get_extension(old_path)
-            # Create new path with new filename (keep extension and location)
-            new_path = old_path.parent.joinpath(filename + ext)
-            # Double check if path points to a file to avoid accidentally
-            # moving directory. `is_file()` is the most important check here.
-            if old_path == new_path:
-                log.debug(f'File `{old_path}` does not need to be '
-                          'renamed. Skipping.')
-            elif new_path.exists():
-                log.warn(f'Cannot rename `{old_path}` to `{new_path}` '
-                         'because a file with the same name already '
-                         'exists. Skipping.')
+            # Create new path with new filename (keep extension and
+            # location). Assemble it as a string; ``os.path.join`` is much
+            # cheaper than pathlib's parsing in this per-entry loop.
+            old_str = str(old_path)
+            new_str = os.path.join(os.path.dirname(old_str), filename + ext)
+            if old_str == new_str:
+                log.debug('File `%s` does not need to be renamed. Skipping.',
+                          old_str)
+            elif os.path.exists(new_str):
+                log.warn(
+                    'Cannot rename `%s` to `%s` because a file with the '
+                    'same name already exists. Skipping.', old_str, new_str)
             else:
-                self._move_file(old_path, new_path)
-                entry['file'] = str(new_path)
+                self._move_file(old_path, pathlib.Path(new_str))
+                entry['file'] = new_str
+                file_index.pop(old_str, None)
 
     def move_according_to_bib(self) -> None:
         """Move files to group specified in BibTeX file."""
         db = self._get_db()
+        # One scandir pass per group replaces a stat syscall per entry.
+        file_index = self._build_file_index()
         for entry in db.entries:
             # Skip entries with invalid files.
             # Logging takes place inside helper function.
-            if not self._entry_file_is_valid(entry):
+            old_path = self._entry_file_path(entry, file_index)
+            if old_path is None:
                 continue
             # Add default group
             if 'groups' not in entry:
                 entry['groups'] = self.default_group
             elif entry['groups'] == '':
                 entry['groups'] = self.default_group
-            old_path = pathlib.Path(entry['file'])
-            new_path = self.storage_path.joinpath(
-                entry['groups'],
-                old_path.name,
-            )
-            # Double check if path points to a file to avoid accidentally
-            # moving directory. `is_file()` is the most important check here.
-            if old_path == new_path:
-                log.debug(f'File `{old_path}` does not need to be moved. '
-                          'Skipping.')
-            elif new_path.exists():
-                log.warn(f'Cannot move `{old_path}` to `{new_path}` '
-                         'because a file with the same name already '
-                         'exists in that location. Skipping.')
+            old_str = str(old_path)
+            new_str = os.path.join(self._storage_str, entry['groups'],
+                                   os.path.basename(old_str))
+            if old_str == new_str:
+                log.debug('File `%s` does not need to be moved. Skipping.',
+                          old_str)
+            elif os.path.exists(new_str):
+                log.warn(
+                    'Cannot move `%s` to `%s` because a file with the same '
+                    'name already exists in that location. Skipping.',
+                    old_str, new_str)
             else:
-                self._move_file(old_path, new_path)
-                entry['file'] = str(new_path)
+                self._move_file(old_path, pathlib.Path(new_str))
+                entry['file'] = new_str
+                file_index.pop(old_str, None)
 
     def rekey_according_to_bib(self) -> None:
         """Generate a new key for each entry in the BibTeX file.
@@ -212,8 +284,11 @@ class Library:
         Handles duplicates by appending `_dup` to the keys.
         """
         db = self._get_db()
-        new_db = bibtexparser.Library()
+        # Track taken keys in a set instead of probing ``entries_dict``,
+        # which bibtexparser rebuilds from the entry list on every access.
+        existing_keys = {entry.key for entry in db.entries}
         for entry in db.entries:
+            old_key = entry.key
             # Use helper to generate a new key
             new_key = self._entry_string(
                 entry,
@@ -222,20 +297,21 @@ class Library:
             )
             # If new key is empty, don't change it
             if (new_key is None) or (new_key == ''):
-                log.warn('Cannot generate new key for entry with key '
-                         f'`{entry.key}`. Skipping.')
-                new_key = entry.key
-            elif new_key != entry.key:
+                log.warn(
+                    'Cannot generate new key for entry with key `%s`. '
+                    'Skipping.', old_key)
+                new_key = old_key
+            elif new_key != old_key:
                 # If there's a duplicate, change the name
-                while new_key in db.entries_dict.keys():
-                    log.warn(f'Two entires share the key `{entry.key}`. '
-                             'Appending `_dup` to second entry.')
+                while new_key in existing_keys:
+                    log.warn(
+                        'Two entires share the key `%s`. Appending `_dup` '
+                        'to second entry.', old_key)
                     new_key += '_dup'
             else:
-                log.debug(f'Key {new_key} not changed.')
+                log.debug('Key %s not changed.', new_key)
             entry.key = new_key
-            new_db.add(entry)
-        self._db = new_db
+            existing_keys.add(new_key)
 
     def organize(self) -> None:
         """Organize BibTeX library."""
@@ -259,12 +335,18 @@ class Library:
             key = key.lower()
         # Check validity of PDF path, then link if valid.
         if not file_path.exists():
-            log.warning(f'{file_path} does not exist. Not adding.')
+            log.warning('%s does not exist. Not adding.', file_path)
         elif not file_path.is_file():
-            log.warning(f'{file_path} is not a file. Not adding.')
+            log.warning('%s is not a file. Not adding.', file_path)
         else:
-            if key in db.entries_dict.keys():
-                db.entries_dict[key]['file'] = str(file_path.resolve())
+            # ``abspath`` normalizes without the per-component symlink
+            # syscalls that ``resolve()`` makes
+            file_str = os.path.abspath(file_path)
+            # ``entries_dict`` is rebuilt from the entry list on every
+            # property access, so fetch it once and look the key up once.
+            existing = db.entries_dict.get(key)
+            if existing is not None:
+                existing['file'] = file_str
             else:
                 entry = bibtexparser.model.Entry(
                     entry_type='misc',
@@ -272,7 +354,7 @@ class Library:
                     fields=[
                         bibtexparser.model.Field(
                             key='file',
-                            value=str(file_path.resolve()),
+                            value=file_str,
                         )
                     ],
                 )
@@ -288,7 +370,7 @@ class Library:
         """Update entry in library."""
         db = self._get_db()
         entry_log = {'new': copy.deepcopy(new_entry)}
-        if entry_key in db.entries_dict.keys():
+        if entry_key in db.entries_dict:
             old_entry = db.entries_dict[entry_key]
             entry_log['old'] = copy.deepcopy(old_entry)
             old_entry.entry_type = new_entry.entry_type
@@ -301,7 +383,7 @@ class Library:
                     old_entry.set_field(new_entry.fields_dict[field_key])
             entry_log['merged'] = copy.deepcopy(old_entry)
         else:
-            log.debug(f'Key {entry_key} not in library.')
+            log.debug('Key %s not in library.', entry_key)
         return entry_log
 
     def write_bib_file(self) -> None:
@@ -317,31 +399,31 @@ class Library:
             self._dry_run_msg(f'Writing `{self.bibtex_file}`.')
         else:
             # Delete .bak file if it exists
-            log.info(f'Deleting `{self.bibtex_bak_file}`.')
+            log.info('Deleting `%s`.', self.bibtex_bak_file)
             self.bibtex_bak_file.unlink(missing_ok=True)
             # Rename .bib file to .bib.bak
-            log.info(f'Moving `{self.bibtex_file}` to '
-                     f'`{self.bibtex_bak_file}`.')
+            log.info('Moving `%s` to `%s`.', self.bibtex_file,
+                     self.bibtex_bak_file)
             if self.bibtex_file.exists():
                 self.bibtex_file.rename(self.bibtex_bak_file)
-            # Write new .bib file
-            log.info(f'Writing `{self.bibtex_file}`.')
+            # Write new .bib file. Render the whole library to a string
+            # first so the file is written with a single call instead of
+            # streaming block by block.
+            log.info('Writing `%s`.', self.bibtex_file)
             try:
-                bibtexparser.write_file(
-                    str(self.bibtex_file.resolve()),
+                bib_str = bibtexparser.write_string(
                     db,
-                    append_middleware=[
-                        bibtexparser.middlewares.MergeNameParts(),
-                        bibtexparser.middlewares.MergeCoAuthors(),
-                        bibtexparser.middlewares.SortFieldsCustomMiddleware(
-                            order=tuple(self.field_order)),
-                    ],
+                    prepend_middleware=self._write_middleware,
                     bibtex_format=self._bibtex_format,
                 )
+                self.bibtex_file.write_text(bib_str, encoding='utf-8')
             except ValueError:
-                log.warning(
-                    f'Failed to write `{self.bibtex_file}`, restoring backup.')
+                log.warning('Failed to write `%s`, restoring backup.',
+                            self.bibtex_file)
                 shutil.copy(self.bibtex_bak_file, self.bibtex_file)
+            # The freshly written file no longer matches the cache. Delete
+            # the cache so the next ``open()`` re-parses and re-caches.
+            self.bibtex_cache_file.unlink(missing_ok=True)
 
     def _get_db(self) -> bibtexparser.Library:
         """Raise error if BibTeX file is not open."""
@@ -349,6 +431,51 @@ class Library:
             raise RuntimeError('Must call `open()` to open BibTeX file.')
         return self._db
 
+    def _db_cache_key(self) -> Optional[Tuple[int, int]]:
+        """Get modification time and size of the BibTeX file."""
+        try:
+            st = os.stat(self.bibtex_file)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _read_db_cache(self) -> Optional[bibtexparser.Library]:
+        """Load the parsed library from the cache file.
+
+        Returns ``None`` if there is no cache, the cache is unreadable, or
+        the BibTeX file changed since the cache was written.
+        """
+        key = self._db_cache_key()
+        if key is None:
+            return None
+        try:
+            with open(self.bibtex_cache_file, 'rb') as f:
+                cached_key, db = pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError, AttributeError,
+                ValueError):
+            return None
+        if cached_key != key:
+            log.debug('Cache for `%s` is stale.', self.bibtex_file)
+            return None
+        log.info('Loaded parsed library from `%s`.', self.bibtex_cache_file)
+        return db
+
+    def _write_db_cache(self) -> None:
+        """Write the parsed library to the cache file.
+
+        If dry_run is specified, skips file operations.
+        """
+        if self.dry_run or (self._db is None):
+            return
+        key = self._db_cache_key()
+        if key is None:
+            return
+        try:
+            with open(self.bibtex_cache_file, 'wb') as f:
+                pickle.dump((key, self._db), f)
+        except (OSError, pickle.PickleError):
+            log.debug('Could not write cache `%s`.', self.bibtex_cache_file)
+
     def _move_file(
         self,
         old_file: pathlib.Path,
@@ -361,42 +488,101 @@ class Library:
         if self.dry_run:
             self._dry_run_msg(f'Moving `{old_file}` to `{new_file}`.')
         elif not old_file.exists():
-            log.warning(f'{old_file} does not exist. Not moving.')
+            log.warning('%s does not exist. Not moving.', old_file)
         elif not old_file.is_file():
-            log.warning(f'{old_file} is not a file. Not moving.')
+            log.warning('%s is not a file. Not moving.', old_file)
         else:
-            log.info(f'Moving `{old_file}` to `{new_file}`.')
-            shutil.move(old_file, new_file)
+            log.info('Moving `%s` to `%s`.', old_file, new_file)
+            # A move within one directory is always within one filesystem,
+            # so the device probe can be skipped for plain renames.
+            if old_file.parent == new_file.parent:
+                same_fs = True
+            else:
+                try:
+                    same_fs = os.stat(old_file).st_dev == self._storage_dev
+                except OSError:
+                    same_fs = False
+            if same_fs:
+                # Within one filesystem, ``os.replace`` is a single atomic
+                # rename and skips the copy-fallback machinery of
+                # ``shutil.move``.
+                os.replace(old_file, new_file)
+            else:
+                shutil.move(old_file, new_file)
 
     @staticmethod
     def _dry_run_msg(s: str) -> None:
         """Print dry run info message."""
         log.info('(Dry run) ' + s)
 
+    def _build_file_index(self) -> Dict[str, os.stat_result]:
+        """Index the regular files under the storage path.
+
+        Maps absolute path strings to their ``stat`` results using one
+        ``os.scandir`` pass per group directory, so the per-entry validity
+        checks can skip individual ``stat`` syscalls for files that are
+        already under management.
+        """
+        index: Dict[str, os.stat_result] = {}
+        try:
+            groups = [
+                dir_entry.path for dir_entry in os.scandir(self._storage_str)
+                if dir_entry.is_dir()
+            ]
+        except OSError:
+            return index
+        for group in groups:
+            try:
+                with os.scandir(group) as dir_entries:
+                    for dir_entry in dir_entries:
+                        try:
+                            index[dir_entry.path] = dir_entry.stat()
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return index
+
     @staticmethod
-    def _entry_file_is_valid(entry: bibtexparser.model.Entry) -> bool:
-        """Check the validity of a `file` field of an entry.
+    def _entry_file_path(
+        entry: bibtexparser.model.Entry,
+        file_index: Optional[Dict[str, os.stat_result]] = None,
+    ) -> Optional[pathlib.Path]:
+        """Get the validated path of the `file` field of an entry.
 
         Ensures that the entry has a `file` field, the `file` field is
         nonempty, the file pointed to exists, and the file pointed to is
-        a file, not a directory.
+        a file, not a directory. The existence and type checks share a
+        single ``os.stat`` call, or none at all when the file is found in
+        ``file_index``. Returns ``None`` if any check fails.
         """
+        key = entry.key
         if 'file' not in entry:
-            log.warn(f'No file in entry with key `{entry.key}`. Skipping.')
-            return False
-        if entry['file'] == '':
-            log.warn(f'File field in entry with key `{entry.key}` is '
-                     'empty. Skipping.')
-            return False
-        if not pathlib.Path(entry['file']).exists():
-            log.warn(f"File `{entry['file']}` in entry with key "
-                     f"`{entry.key}` does not exist. Skipping.")
-            return False
-        if not pathlib.Path(entry['file']).is_file():
-            log.warn(f"File `{entry['file']}` in entry with key "
-                     f"`{entry.key}` is not a file. Skipping.")
-            return False
-        return True
+            log.warn('No file in entry with key `%s`. Skipping.', key)
+            return None
+        file_field = entry['file']
+        if file_field == '':
+            log.warn(
+                'File field in entry with key `%s` is empty. Skipping.',
+                key)
+            return None
+        file_path = pathlib.Path(file_field)
+        file_stat = file_index.get(
+            file_field) if file_index is not None else None
+        if file_stat is None:
+            try:
+                file_stat = os.stat(file_path)
+            except OSError:
+                log.warn(
+                    'File `%s` in entry with key `%s` does not exist. '
+                    'Skipping.', file_field, key)
+                return None
+        if not stat.S_ISREG(file_stat.st_mode):
+            log.warn(
+                'File `%s` in entry with key `%s` is not a file. '
+                'Skipping.', file_field, key)
+            return None
+        return file_path
 
     @staticmethod
     def _entry_string(
@@ -410,23 +596,25 @@ class Library:
         `title` fields are empty or not present, they are skipped.
         """
         string_components = []
-        if ('author' in entry) and entry['author']:
+        author = entry['author'] if 'author' in entry else None
+        if author:
             # Last name of first author
-            last_name = entry['author'][0].last[0]
+            last_name = author[0].last[0]
             string_components.append(utilities.clean_string_for_key(last_name))
-        if ('year' in entry) and entry['year']:
-            string_components.append(
-                utilities.clean_string_for_key(entry['year']))
-        if ('title' in entry) and entry['title']:
+        year = entry['year'] if 'year' in entry else None
+        if year:
+            string_components.append(utilities.clean_string_for_key(year))
+        title = entry['title'] if 'title' in entry else None
+        if title:
             if words_from_title is None:
                 # Take all of title
                 string_components.append(
-                    utilities.clean_string_for_key(entry['title']))
+                    utilities.clean_string_for_key(title))
             else:
                 # Take up to `words_from_title` words from title
                 string_components.append(
                     utilities.clean_string_for_key('_'.join(
-                        entry['title'].split(' ')[:words_from_title])))
+                        title.split(' ')[:words_from_title])))
         if len(string_components) > 0:
             entry_string = '_'.join(string_components)[:max_length]
         else:
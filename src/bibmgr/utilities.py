@@ -1,19 +1,47 @@
 """Shared utilities."""
 
+import functools
 import pathlib
-import string
+import re
 from typing import Optional
 
+# Characters that are not allowed in a key or filename
+_INVALID_KEY_CHAR_RE = re.compile(r'[^a-z0-9_]')
 
+# Characters that are not allowed in a query
+_INVALID_QUERY_CHAR_RE = re.compile(r'[^a-z0-9 ]')
+
+_ALLOWED_KEY_CHARS = 'abcdefghijklmnopqrstuvwxyz0123456789_'
+
+# Translation table covering all of ASCII: allowed characters pass through,
+# spaces become underscores, and everything else is deleted. ``str.translate``
+# runs in C, skipping the regex engine for the common all-ASCII case.
+_KEY_TRANSLATION = {codepoint: None for codepoint in range(128)}
+_KEY_TRANSLATION.update({ord(char): char for char in _ALLOWED_KEY_CHARS})
+_KEY_TRANSLATION[ord(' ')] = '_'
+
+# Same idea for queries: disallowed ASCII characters become spaces.
+_QUERY_TRANSLATION = {codepoint: ' ' for codepoint in range(128)}
+_QUERY_TRANSLATION.update(
+    {ord(char): char for char in _ALLOWED_KEY_CHARS[:-1]})
+_QUERY_TRANSLATION[ord(' ')] = ' '
+
+
+@functools.lru_cache(maxsize=16384)
 def clean_string_for_key(s: str) -> str:
     """Clean up a string for a key or filename.
 
     Makes the string lowercase, replaces spaces with underscores, and removes
     characters that are not lowercase letters, numbers, or underscores.
+
+    Results are memoized: renaming and rekeying clean the same author, year,
+    and title strings repeatedly, and many entries share authors and years.
     """
-    valid = string.ascii_lowercase + string.digits + '_'
-    s_nospace = s.lower().replace(' ', '_')
-    s_clean = ''.join(char for char in s_nospace if char in valid)
+    s_lower = s.lower()
+    if s_lower.isascii():
+        return s_lower.translate(_KEY_TRANSLATION)
+    s_nospace = s_lower.replace(' ', '_')
+    s_clean = _INVALID_KEY_CHAR_RE.sub('', s_nospace)
     return s_clean
 
 
@@ -23,31 +51,35 @@ def clean_string_for_query(s: Optional[str]) -> str:
     Makes the string lowercase, replaces underscores and dashes with spaces,
     and removes characters that are not lowercase letters, numbers, or spaces.
     """
-    valid = string.ascii_lowercase + string.digits + ' '
     if s is None:
         s_clean = ''
     else:
-        chars = []
-        for char in s.lower():
-            if char in valid:
-                chars.append(char)
-            else:
-                chars.append(' ')
-        s_clean = ''.join(chars)
+        s_lower = s.lower()
+        if s_lower.isascii():
+            s_clean = s_lower.translate(_QUERY_TRANSLATION)
+        else:
+            s_clean = _INVALID_QUERY_CHAR_RE.sub(' ', s_lower)
     return s_clean
 
 
+# Extensions that consist of two parts
+_KNOWN_DOUBLE_EXTENSIONS = frozenset(['.tar.gz', '.tar.bz2'])
+
+
 def get_extension(path: pathlib.Path) -> str:
     """Get the extension of a path.
 
     Assumes all extensions except ``.tar.gz`` and ``.tar.bz2`` are single
-    extensions.
+    extensions. Returns an empty string if the path has no extension.
     """
-    known_double_extensions = ['.tar.gz', '.tar.bz2']
+    # ``suffixes`` rebuilds its list on every access, so read it once.
+    suffixes = path.suffixes
+    if not suffixes:
+        return ''
     # If extension is not a known double extension, take last part only.
-    extensions = ''.join(path.suffixes)
-    if extensions in known_double_extensions:
+    extensions = ''.join(suffixes)
+    if extensions in _KNOWN_DOUBLE_EXTENSIONS:
         ext = extensions
     else:
-        ext = path.suffixes[-1]
+        ext = suffixes[-1]
     return ext